@@ -1,20 +1,19 @@
-import pandas as pd
-from datasets import load_dataset, Audio
 import os
 import shutil 
 from collections import defaultdict
 from itertools import islice
 
 # --- NEW: Google Gemini/API integration ---
-import google.generativeai as genai
+# Tunge avhengigheter (datasets, google.generativeai) importeres inne i
+# funksjonene som trenger dem, slik at modulen er rask å laste.
 import time
-from dotenv import load_dotenv
 
 # --- Configuration ---
 DATASET_NAME = "distil-whisper/earnings22"
 SPLIT = "test" 
 CONFIG_NAME = "chunked"
 OUTPUT_DIR = "full_transcripts_output"
+EN_OUTPUT_DIR = "full_transcripts_en"
 
 # Set this to control how many unique, full-length transcripts are reconstructed
 NUM_CALLS_TO_PROCESS = 26 
@@ -22,23 +21,26 @@ NUM_CALLS_TO_PROCESS = 26
 # --- Progress Bar Configuration ---
 PROGRESS_UPDATE_INTERVAL = 500 # Print status every X segments processed
 
-# Suppress benign warnings/errors from datasets library on Windows
-import datasets
-datasets.logging.set_verbosity_error()
+GEMINI_MODEL_NAME = 'gemini-2.5-flash' 
+
+TRANSLATION_PROMPT = "Oversett følgende transkripsjon av en earnings call nøyaktig til profesjonelt norsk. Behold alle tall, navn og tekniske termer som de er. Her er transkripsjonen:\n\n---\n{text}\n---"
+# Written instead of the translation when the API gives up; such files must not count as done
+TRANSLATION_FAILED = "TRANSLATION FAILED"
 
 # --- Gemini Setup (FROM YOUR SECOND FILE) ---
-load_dotenv() 
+def configure_gemini():
+    """Leser GEMINI_API_KEY og konfigurerer Gemini. Kalles først når vi faktisk skal oversette."""
+    import google.generativeai as genai
+    from dotenv import load_dotenv
+
+    load_dotenv() 
 
-API_KEY = os.getenv("GEMINI_API_KEY") 
-if not API_KEY:
-    raise ValueError("GEMINI_API_KEY er ikke funnet. Vennligst sjekk .env-filen eller miljøvariablene.")
+    api_key = os.getenv("GEMINI_API_KEY") 
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY er ikke funnet. Vennligst sjekk .env-filen eller miljøvariablene.")
 
-try:
-    genai.configure(api_key=API_KEY)
-    GEMINI_MODEL_NAME = 'gemini-2.5-flash' 
-except Exception as e:
-    print(f"Feil ved konfigurering av Gemini API: {e}")
-    exit()
+    genai.configure(api_key=api_key)
+    return genai
 
 # --- Hjelpefunksjoner ---
 
@@ -72,14 +74,14 @@ def generate_content_with_retry(model, prompt, max_retries=5, initial_wait=30):
     return None
 
 
-def translate_to_norwegian(text: str) -> str:
+def translate_to_norwegian(text: str, genai) -> str:
     """
     Kaller Gemini LLM for å oversette teksten til profesjonell norsk, 
     og bruker retry-logikken.
     """
     model = genai.GenerativeModel(GEMINI_MODEL_NAME)
     
-    prompt = f"Oversett følgende transkripsjon av en earnings call nøyaktig til profesjonelt norsk. Behold alle tall, navn og tekniske termer som de er. Her er transkripsjonen:\n\n---\n{text}\n---"
+    prompt = TRANSLATION_PROMPT.format(text=text)
     
     print("\n[LLM TRANSLATION] Kaller Gemini for oversettelse til norsk...")
     
@@ -88,22 +90,22 @@ def translate_to_norwegian(text: str) -> str:
     if response and response.text:
         return response.text
     
-    return "TRANSLATION FAILED: Klarte ikke å hente en oversettelse fra API-et."
+    return f"{TRANSLATION_FAILED}: Klarte ikke å hente en oversettelse fra API-et."
 
 
-def clear_output_directory():
+def clear_output_directory(directory: str = OUTPUT_DIR):
     """Removes the output directory and all its contents, then recreates it."""
-    if os.path.exists(OUTPUT_DIR):
-        print(f"🧹 Clearing existing directory: '{OUTPUT_DIR}'...")
+    if os.path.exists(directory):
+        print(f"🧹 Clearing existing directory: '{directory}'...")
         try:
-            shutil.rmtree(OUTPUT_DIR)
+            shutil.rmtree(directory)
             print("   Directory successfully cleared.")
         except Exception as e:
             print(f"Error clearing directory: {e}")
 
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
-        print(f"   Recreated directory: '{OUTPUT_DIR}'")
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+        print(f"   Recreated directory: '{directory}'")
 
 def save_transcript_to_file(transcript: str, filename: str, directory: str = OUTPUT_DIR):
     """Saves the reconstructed or translated transcript to a plain text file."""
@@ -119,6 +121,131 @@ def save_transcript_to_file(transcript: str, filename: str, directory: str = OUT
         print(f"Error saving file: {e}")
 
 
+def collect_calls(dataset_name: str, split: str, config_name: str, num_calls: int):
+    """
+    Streams the dataset and collects the segments for the first `num_calls` calls.
+    Returns a dict: call_id -> {'segments': [...]}.
+    """
+    import datasets
+    from datasets import load_dataset, Audio
+
+    # Suppress benign warnings/errors from datasets library on Windows
+    datasets.logging.set_verbosity_error()
+
+    print(f"--- Loading Dataset: {dataset_name}, Config: {config_name}, Split: {split} (Streaming Mode) ---")
+
+    dataset_stream = load_dataset(dataset_name, config_name, split=split, streaming=True)
+    
+    if 'audio' in dataset_stream.column_names:
+        dataset_stream = dataset_stream.cast_column("audio", Audio(decode=False))
+        dataset_stream = dataset_stream.remove_columns(['audio'])
+
+    print(f"Streaming data and processing segments until {num_calls} calls are complete...")
+    call_data = group_segments(dataset_stream, num_calls)
+
+    print(f"\nCalls successfully collected: {len(call_data)}")
+    return call_data
+
+
+def group_segments(segments, num_calls: int):
+    """
+    Groups a stream of dataset segments by file_id until `num_calls` calls are found.
+    Returns a dict: call_id -> {'segments': [...]}.
+    """
+    call_data = defaultdict(lambda: {'segments': []})
+    processed_call_ids = set()
+    
+    total_segments = 0
+    
+    for segment in segments:
+        total_segments += 1
+        call_id = segment['file_id']
+        
+        # --- Progress Bar Update (Segments) ---
+        if total_segments % PROGRESS_UPDATE_INTERVAL == 0:
+            print(f"   [STREAMING PROGRESS] Segments processed: {total_segments:,} | Calls found: {len(processed_call_ids)}/{num_calls}...", end='\r')
+
+        segment_text = segment.get('transcription', segment.get('sentence', ''))
+        start_ts = segment.get('start_ts', 0)
+        end_ts = segment.get('end_ts', start_ts)
+
+        if segment_text:
+            call_data[call_id]['segments'].append({
+                'text': segment_text, 
+                'start_ts': start_ts,
+                'end_ts': end_ts
+            })
+        
+        if call_id not in processed_call_ids:
+            processed_call_ids.add(call_id)
+            if len(processed_call_ids) >= num_calls:
+                print(f"\nStopping stream after collecting segments for the first {num_calls} calls. Total segments processed: {total_segments:,}")
+                break
+
+    return call_data
+
+
+def reconstruct_transcript(segments: list):
+    """
+    Sorts the segments by start time and stitches them into one transcript.
+    Returns (full_transcript, duration_in_minutes, word_count).
+    """
+    segments.sort(key=lambda x: x['start_ts'])
+    full_transcript = " ".join([s['text'] for s in segments])
+    
+    max_end_ts = max((s['end_ts'] for s in segments), default=0)
+    total_duration = max_end_ts / 60
+    word_count = len(full_transcript.split())
+    return full_transcript, total_duration, word_count
+
+
+def extract_transcripts(dataset_name: str, split: str, config_name: str, num_calls: int, directory: str = EN_OUTPUT_DIR):
+    """Reconstructs the calls and saves the original (EN) transcripts without translating."""
+    clear_output_directory(directory)
+    call_data = collect_calls(dataset_name, split, config_name, num_calls)
+
+    for call_id, data in call_data.items():
+        full_transcript, total_duration, word_count = reconstruct_transcript(data['segments'])
+        print(f"\n[CALL] ID: {call_id} | Duration: {total_duration:.2f} min | Words: {word_count:,}")
+        save_transcript_to_file(full_transcript, f"transcript_EN_{call_id}.txt", directory)
+
+
+def translate_transcripts(source_dir: str = EN_OUTPUT_DIR, target_dir: str = OUTPUT_DIR):
+    """Translates every saved EN transcript in `source_dir` and saves the NO version in `target_dir`."""
+    # Check the API key and the source files before touching the (DVC-tracked) output directory
+    genai = configure_gemini()
+    filenames = sorted(f for f in os.listdir(source_dir) if f.endswith(".txt"))
+    clear_output_directory(target_dir)
+
+    for i, filename in enumerate(filenames):
+        call_id = filename.replace("transcript_EN_", "").replace(".txt", "")
+        with open(os.path.join(source_dir, filename), 'r', encoding='utf-8') as f:
+            full_transcript = f.read()
+
+        print(f"\n[CALL {i + 1}/{len(filenames)}] ID: {call_id}")
+        norwegian_transcript = translate_to_norwegian(full_transcript, genai)
+        save_transcript_to_file(norwegian_transcript, f"transcript_NO_{call_id}.txt", target_dir)
+
+        # Pause to avoid immediate rate limit
+        time.sleep(5) 
+
+    failed = failed_translations(target_dir)
+    if failed:
+        print(f"\n❌ {len(failed)} translation(s) failed: {', '.join(failed)}")
+
+
+def failed_translations(directory: str = OUTPUT_DIR):
+    """Names of the files in `directory` that hold the TRANSLATION_FAILED marker instead of a translation."""
+    if not os.path.isdir(directory):
+        return []
+    failed = []
+    for filename in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+            if f.read().startswith(TRANSLATION_FAILED):
+                failed.append(filename)
+    return failed
+
+
 # =================================================================
 # Modified: Core function 'explore_dataset'
 # =================================================================
@@ -126,52 +253,13 @@ def explore_dataset(dataset_name: str, split: str, config_name: str, num_calls:
     """
     Loads, reconstructs, saves, translates, and saves the translated transcripts.
     """
-    # 0. Clean up before starting
+    # 0. Check the API key, then clean up before starting
+    genai = configure_gemini()
     clear_output_directory() 
 
-    print(f"--- Loading Dataset: {dataset_name}, Config: {config_name}, Split: {split} (Streaming Mode) ---")
-    
     try:
-        dataset_stream = load_dataset(dataset_name, config_name, split=split, streaming=True)
-        
-        if 'audio' in dataset_stream.column_names:
-            dataset_stream = dataset_stream.cast_column("audio", Audio(decode=False))
-            dataset_stream = dataset_stream.remove_columns(['audio'])
-
-        call_data = defaultdict(lambda: {'segments': []})
-        processed_call_ids = set()
-        
-        total_segments = 0
-        
-        print(f"Streaming data and processing segments until {num_calls} calls are complete...")
-        
         # 1. STREAMING AND RECONSTRUCTION (Collect Segments)
-        for segment in dataset_stream:
-            total_segments += 1
-            call_id = segment['file_id']
-            
-            # --- Progress Bar Update (Segments) ---
-            if total_segments % PROGRESS_UPDATE_INTERVAL == 0:
-                print(f"   [STREAMING PROGRESS] Segments processed: {total_segments:,} | Calls found: {len(processed_call_ids)}/{num_calls}...", end='\r')
-
-            segment_text = segment.get('transcription', segment.get('sentence', ''))
-            start_ts = segment.get('start_ts', 0)
-            end_ts = segment.get('end_ts', start_ts)
-
-            if segment_text:
-                call_data[call_id]['segments'].append({
-                    'text': segment_text, 
-                    'start_ts': start_ts,
-                    'end_ts': end_ts
-                })
-            
-            if call_id not in processed_call_ids:
-                processed_call_ids.add(call_id)
-                if len(processed_call_ids) >= num_calls:
-                    print(f"\nStopping stream after collecting segments for the first {num_calls} calls. Total segments processed: {total_segments:,}")
-                    break
-
-        print(f"\nCalls successfully collected: {len(call_data)}")
+        call_data = collect_calls(dataset_name, split, config_name, num_calls)
         
         # 2. STITCHING, SAVING, AND TRANSLATING
         completed_calls_count = 0
@@ -181,20 +269,14 @@ def explore_dataset(dataset_name: str, split: str, config_name: str, num_calls:
         for call_id, data in call_data.items():
             
             # Sort and Reconstruct
-            data['segments'].sort(key=lambda x: x['start_ts'])
-            full_transcript = " ".join([s['text'] for s in data['segments']])
-            
-            # Summary
-            max_end_ts = max(s['end_ts'] for s in data['segments'])
-            total_duration = max_end_ts / 60
-            word_count = len(full_transcript.split())
+            full_transcript, total_duration, word_count = reconstruct_transcript(data['segments'])
             
             print(f"\n[CALL {completed_calls_count + 1}/{num_calls}] ID: {call_id} | Duration: {total_duration:.2f} min | Words: {word_count:,}")
 
             # 2.1. (REMOVED: Saving the original English transcript)
             
             # 2.2. Translate the full transcript
-            norwegian_transcript = translate_to_norwegian(full_transcript)
+            norwegian_transcript = translate_to_norwegian(full_transcript, genai)
             
             # 2.3. Save Translated Transcript (Norwegian)
             translated_filename = f"transcript_NO_{call_id}.txt"
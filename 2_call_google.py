@@ -1,31 +1,36 @@
 import os
 import glob
 import pandas as pd
-import google.generativeai as genai
 import time
 import hashlib 
-import re 
 from dotenv import load_dotenv
-import mlflow 
-from mlflow import log_metric, log_param, log_artifact
+from aggregat_kube import last_kube, lagre_kube, oppdater_kube, registrer_resultatfil, snitt_per_kategori, utled_periode
+from score_parser import scorer_fra_tekst, parse_raa_svar, til_resultater, legg_til_raa_svar, lagre_raa_svar
 
 # --- KONFIGURASJON ---
 MLFLOW_EXPERIMENT_NAME = "Organisatorisk helsemonitor med KI - v3"
 
-load_dotenv() 
-
-API_KEY = os.getenv("GEMINI_API_KEY") 
-if not API_KEY:
-    raise ValueError("GEMINI_API_KEY er ikke funnet.")
-
-genai.configure(api_key=API_KEY)
-
 # MODEL_NAME = 'models/gemini-2.5-flash-preview-09-2025'
 MODEL_NAME = 'gemini-2.5-flash'
 PROMPT_DIR = "prompts" 
+TRANSCRIPT_DIR = "full_transcripts_output"
+OUTPUT_FILENAME = "analyse_resultater.csv"
 
 # --- Hjelpefunksjoner ---
 
+def configure_gemini():
+    """Leser GEMINI_API_KEY og konfigurerer Gemini (google.generativeai importeres først her)."""
+    import google.generativeai as genai
+
+    load_dotenv() 
+
+    api_key = os.getenv("GEMINI_API_KEY") 
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY er ikke funnet.")
+
+    genai.configure(api_key=api_key)
+    return genai
+
 def load_prompt(filename):
     filepath = os.path.join(PROMPT_DIR, filename)
     with open(filepath, 'r', encoding='utf-8') as f:
@@ -53,8 +58,16 @@ def generate_content_with_retry(model, prompt, max_retries=5, initial_wait=30):
     print("❌ Ga opp etter maksimale gjentakelser.")
     return None
 
-def get_stability_score(transcript_text):
-    """Henter Business Stability Score med Retry-logikk."""
+def parse_stability_score(text):
+    """Henter hovedscoren (-2..+2) fra modellens svar. 0 hvis ingen gyldig score finnes."""
+    return scorer_fra_tekst(text, 1)[0]
+
+def parse_driver_scores(driver_raw, n_drivers=7):
+    """Henter de 7 driver-scorene (-2..+2) fra modellens svar, fyller ut med 0 der de mangler."""
+    return scorer_fra_tekst(driver_raw, n_drivers)
+
+def get_stability_reply(transcript_text, genai):
+    """Henter modellens rå svar for Business Stability Score med Retry-logikk."""
     model = genai.GenerativeModel(MODEL_NAME)
     prompt = load_prompt('business_stability_prompt.txt').format(transcript_text=transcript_text) 
     
@@ -62,16 +75,15 @@ def get_stability_score(transcript_text):
     response = generate_content_with_retry(model, prompt)
     
     if response and response.text:
-        try:
-            matches = re.findall(r'-?\d+', response.text)
-            if matches:
-                return int(matches[0])
-        except Exception as e:
-            print(f"Feil ved parsing av score: {e}")
+        return response.text
             
-    return 0
+    return ""
 
-def get_driver_analysis(transcript_text, stability_score):
+def get_stability_score(transcript_text, genai):
+    """Henter Business Stability Score med Retry-logikk."""
+    return parse_stability_score(get_stability_reply(transcript_text, genai))
+
+def get_driver_analysis(transcript_text, stability_score, genai):
     """Henter driver-scorene med Retry-logikk."""
     model = genai.GenerativeModel(MODEL_NAME)
     prompt = load_prompt('driver_analysis_prompt.txt').format(
@@ -89,9 +101,15 @@ def get_driver_analysis(transcript_text, stability_score):
 
 
 def main():
+    import mlflow 
+    from mlflow import log_metric, log_param, log_artifact
+
+    # Feiler tidlig hvis API-nøkkelen mangler, før MLflow-kjøringen startes
+    genai = configure_gemini()
     mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
 
-    with mlflow.start_run():
+    with mlflow.start_run() as run:
+        run_id = run.info.run_id
         print(f"MLflow Run startet: {MLFLOW_EXPERIMENT_NAME}")
         
         # Logg prompts
@@ -99,10 +117,12 @@ def main():
         driver_prompt = load_prompt('driver_analysis_prompt.txt')
         log_param("model_name", MODEL_NAME)
         
-        transcript_files = glob.glob("full_transcripts_output/*.txt")
+        transcript_files = glob.glob(os.path.join(TRANSCRIPT_DIR, "*.txt"))
         print(f"Analyserer {len(transcript_files)} filer...")
 
         results = []
+        raa_svar = []
+        kube = last_kube()
 
         for i, filename in enumerate(transcript_files):
             # Vis fremdrift
@@ -112,28 +132,31 @@ def main():
                 content = f.read()
             
             # 1. Hent Hovedscore
-            stability_score = get_stability_score(content)
+            stability_raw = get_stability_reply(content, genai)
+            stability_score = parse_stability_score(stability_raw)
             
             # 2. Hent Drivere
-            driver_raw = get_driver_analysis(content, stability_score)
+            driver_raw = get_driver_analysis(content, stability_score, genai)
             
             # Parsing av tall
-            try:
-                numbers = re.findall(r'-?\d+', driver_raw)
-                driver_scores = [int(n) for n in numbers]
-                
-                if len(driver_scores) < 7:
-                    driver_scores += [0] * (7 - len(driver_scores))
-                else:
-                    driver_scores = driver_scores[:7]     
-            except Exception as e:
-                print(f"Kunne ikke parse tall fra: '{driver_raw}'")
-                driver_scores = [0] * 7
+            driver_scores = parse_driver_scores(driver_raw)
 
             print(f"    -> Score: {stability_score}, Drivere: {driver_scores}")
 
+            periode = utled_periode(content)
+            raa_rad = {
+                "Filnavn": filename,
+                "Periode": periode,
+                "Stabilitet_Svar": stability_raw,
+                "Driver_Svar": driver_raw,
+            }
+            raa_svar.append(raa_rad)
+            # Skriv det rå svaret til disk med en gang, så det overlever en krasj
+            legg_til_raa_svar(raa_rad, run_id)
+
             row = {
                 "Filnavn": filename,
+                "Periode": periode,
                 "Makroforhold": driver_scores[0],
                 "Forsyningskjede": driver_scores[1],
                 "Produksjonskvalitet": driver_scores[2],
@@ -144,14 +167,26 @@ def main():
                 "Forretningsstabilitet": stability_score 
             }
             results.append(row)
+
+            # Oppdater aggregatkuben i minnet med den nye raden (inkrementelt).
+            # Kuben skrives til disk én gang etter løkken; ved krasj kan kjøringen
+            # bygges opp igjen fra de rå svarene med `helsemonitor.py rescore`.
+            kube = oppdater_kube(kube, pd.DataFrame([row]), run_id)
             
             # VIKTIG: Lengre pause mellom hver fil for å unngå 429-feil igjen
             time.sleep(5) 
 
-        # Lagre resultater til DataFrame og CSV
-        df = pd.DataFrame(results)
-        output_filename = "analyse_resultater.csv"
+        # Samle rå svar i parquet (for senere re-scoring uten API-kall) og parse dem samlet
+        raa_df = pd.DataFrame(raa_svar, columns=["Filnavn", "Periode", "Stabilitet_Svar", "Driver_Svar"])
+        raa_fil = lagre_raa_svar(raa_df, run_id)
+        parsed = parse_raa_svar(raa_df)
+
+        # Lagre resultater til DataFrame og CSV (samme scorer som over, pluss parse-konfidens)
+        df = til_resultater(parsed)
+        output_filename = OUTPUT_FILENAME
         df.to_csv(output_filename, index=False, sep=';') 
+        lagre_kube(kube)
+        registrer_resultatfil(run_id, output_filename)
         
         # Logg til MLflow
         
@@ -159,17 +194,10 @@ def main():
         avg_stability = df["Forretningsstabilitet"].mean()
         log_metric("Forretningsstabilitet", avg_stability)
         log_metric("Antall_analysert", len(df))
+        log_metric("Antall_lav_parse_konfidens", int((df["Parse_Konfidens"] < 1).sum()))
         
-        # 2. Driver-metrikker (NY KODE)
-        driver_metrics = {
-            "Makroforhold": df["Makroforhold"].mean(),
-            "Forsyningskjede": df["Forsyningskjede"].mean(),
-            "Produksjonskvalitet": df["Produksjonskvalitet"].mean(),
-            "Kompetanse": df["Kompetanse"].mean(),
-            "Etterspørsel": df["Etterspørsel"].mean(),
-            "Marginstyring": df["Marginstyring"].mean(),
-            "Strategigjennomføring": df["Strategigjennomføring"].mean(),
-        }
+        # 2. Driver-metrikker (hentes fra aggregatkuben for denne kjøringen)
+        driver_metrics = snitt_per_kategori(kube, run_id=run_id).drop("Stabilitet", errors="ignore")
         
         # Logger hver driver-score individuelt
         for name, avg_score in driver_metrics.items():
@@ -177,6 +205,7 @@ def main():
         
         # 3. Logg artefakt
         log_artifact(output_filename) 
+        log_artifact(raa_fil)
         
         print(f"\nFerdig! Resultater lagret i {output_filename}")
         print(f"MLflow Run avsluttet. Alle metrikker, inkludert 7 drivere, ble logget.")
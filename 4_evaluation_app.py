@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 import os
-from sklearn.metrics import precision_score, recall_score, accuracy_score
+from evaluering import beregn_metrikker, siste_vurdering, bygg_prioritetsindeks, oppdater_prioritetsindeks, prioriter
+from aggregat_kube import last_eller_bygg_kube, gjeldende_run, rull_opp
 
 # --- KONFIGURASJON ---
 RESULTAT_FIL = 'analyse_resultater.csv'
@@ -28,26 +29,12 @@ def last_logg():
         return df
     return pd.DataFrame(columns=['Filnavn', 'Kategori', 'Model_Score', 'Human_Score', 'Kommentar'])
 
-def beregn_metrikker(logg_df):
-    if logg_df.empty: return 0, 0, 0, 0
-
-    # --- Implementert endring: Filtrer til kun den siste (reviderte) vurderingen ---
-    # Sorterer dataen implisitt etter rekkefølgen de ble lagt til (som er den siste) 
-    # og beholder kun den siste vurderingen for hver unike kombinasjon av Filnavn og Kategori.
-    logg_df_siste = logg_df.drop_duplicates(subset=['Filnavn', 'Kategori'], keep='last')
-    
-    if logg_df_siste.empty: return 0, 0, 0, 0
-    
-    y_true = logg_df_siste['Human_Score'].astype(int)
-    y_pred = logg_df_siste['Model_Score'].astype(int)
-    
-    precision = precision_score(y_true, y_pred, average='weighted', zero_division=0)
-    recall = recall_score(y_true, y_pred, average='weighted', zero_division=0)
-    accuracy = accuracy_score(y_true, y_pred)
-    antall_filer = logg_df_siste['Filnavn'].nunique() # Bruker den filtrerte DFen
-    
-    return precision, recall, accuracy, antall_filer
-    # --- Slutt på implementert endring ---
+def last_kube_oppsummering():
+    kube = last_eller_bygg_kube(RESULTAT_FIL)
+    if kube.empty: return pd.DataFrame()
+    rull = rull_opp(kube, etter=('Kategori',), run_id=gjeldende_run(kube, RESULTAT_FIL))
+    rull = rull.set_index('Kategori').reindex(KATEGORIER).dropna(subset=['Antall'])
+    return rull[['Antall', 'Snitt', 'Std']]
 
 def les_tekstfil(filnavn_fra_csv):
     if os.path.exists(filnavn_fra_csv): sti = filnavn_fra_csv
@@ -59,6 +46,18 @@ def les_tekstfil(filnavn_fra_csv):
 
 def nullstill_historikk():
     if os.path.exists(LOGG_FIL): os.remove(LOGG_FIL)
+    st.session_state.pop('prioritetsindeks', None)
+
+def hent_prioritetsindeks(df, logg_df):
+    # Indeksen bygges én gang per økt og oppdateres inkrementelt ved lagring.
+    # Den bygges på nytt bare hvis resultatfilen er endret eller loggen er skrevet av noen andre.
+    versjon = os.path.getmtime(RESULTAT_FIL)
+    indeks = st.session_state.get('prioritetsindeks')
+    if indeks is None or indeks.get('versjon') != versjon or indeks['antall_logg'] != len(logg_df):
+        indeks = bygg_prioritetsindeks(df, logg_df)
+        indeks['versjon'] = versjon
+        st.session_state['prioritetsindeks'] = indeks
+    return indeks
 
 def format_tall(val):
     if val > 0: return f"+{val}"
@@ -99,6 +98,10 @@ c2.metric("Nøyaktighet", f"{a:.1%}")
 st.sidebar.metric("Presisjon", f"{p:.1%}")
 st.sidebar.metric("Sensitivitet", f"{r:.1%}")
 st.sidebar.markdown("---")
+with st.sidebar.expander("Modellens snitt pr kategori (siste kjøring)"):
+    kube_oppsummering = last_kube_oppsummering()
+    if kube_oppsummering.empty: st.caption("Ingen aggregerte data.")
+    else: st.dataframe(kube_oppsummering.style.format({'Snitt': '{:+.2f}', 'Std': '{:.2f}'}))
 if st.sidebar.button("🗑️ Slett historikk og start på nytt"):
     nullstill_historikk()
     st.rerun()
@@ -119,12 +122,16 @@ if len(filer_som_vises) == 0:
     st.info("Ingen filer å vise.")
     st.stop()
 
+# Ventende filer sorteres etter prioritet (modellusikkerhet og uenighet), ferdige til slutt
+prioritetsindeks = hent_prioritetsindeks(df, logg_df)
+prioritet = prioriter(prioritetsindeks, [f for f in filer_som_vises if f not in ferdig_evaluert])
+
 def format_func_fil(filnavn):
     base = os.path.basename(filnavn)
     if filnavn in ferdig_evaluert: return f"✅ {base}"
-    return f"📄 {base}"
+    return f"📄 {base} · prioritet {prioritet[filnavn]:.2f}"
 
-filer_som_vises = sorted(filer_som_vises, key=lambda x: x in ferdig_evaluert)
+filer_som_vises = list(prioritet.index) + [f for f in filer_som_vises if f in ferdig_evaluert]
 valgt_fil = st.sidebar.selectbox("Velg fil:", filer_som_vises, format_func=format_func_fil)
 
 rad = df[df['Filnavn'] == valgt_fil].iloc[0]
@@ -153,9 +160,8 @@ with col2:
             kommentar_historikk = ""
             
             # Finner siste vurdering (hvis den finnes) for å forhåndsutfylle skjemaet
-            eksisterende_rad = logg_df[(logg_df['Filnavn'] == valgt_fil) & (logg_df['Kategori'] == kategori)]
-            if not eksisterende_rad.empty:
-                siste_rad = eksisterende_rad.iloc[-1]
+            siste_rad = siste_vurdering(logg_df, valgt_fil, kategori)
+            if siste_rad is not None:
                 default_val = int(siste_rad['Human_Score'])
                 kommentar_historikk = siste_rad.get('Kommentar', "")
 
@@ -208,5 +214,6 @@ with col2:
                 # Hvis alt er OK, lagre (legger til nederst i filen)
                 hdr = not os.path.exists(LOGG_FIL)
                 ny_df.to_csv(LOGG_FIL, mode='a', header=hdr, index=False)
+                oppdater_prioritetsindeks(prioritetsindeks, ny_df)
                 st.toast("Lagret! Listen oppdatert.", icon="✅")
                 st.rerun()
\ No newline at end of file
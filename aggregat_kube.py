@@ -0,0 +1,244 @@
+import os
+import re
+import json
+import hashlib
+import pandas as pd
+
+# --- KONFIGURASJON ---
+KUBE_FIL = 'aggregat_kube.csv'
+
+KATEGORIER = [
+    "Stabilitet", "Makroforhold", "Forsyningskjede",
+    "Produksjonskvalitet", "Kompetanse", "Etterspørselsmønstre",
+    "Prismakt", "Strategigjennomføring"
+]
+
+SCORE_VERDIER = [-2, -1, 0, 1, 2]
+
+NOKKEL_KOLONNER = ['Run_ID', 'Selskap', 'Periode', 'Kategori']
+HIST_KOLONNER = [f"Hist_{v:+d}" if v else "Hist_0" for v in SCORE_VERDIER]
+MAAL_KOLONNER = ['Antall', 'Sum', 'Sum_Kvadrat'] + HIST_KOLONNER
+
+UKJENT_PERIODE = "Ukjent"
+# Run_ID-prefiks for cellene som speiler resultatfilen; suffikset er filens md5
+RESULTATFIL_PREFIKS = "resultatfil"
+
+_KVARTAL_ORD = {"første": 1, "andre": 2, "tredje": 3, "fjerde": 4,
+                "first": 1, "second": 2, "third": 3, "fourth": 4}
+# Q3, Q3 2021, Q3 FY2021, Q3 '21 — to-sifret år krever apostrof ("Q4 10 millioner" er bare Q4)
+_KVARTAL_KORT = re.compile(
+    r'\bQ([1-4])\b(?:\s*(?:FY\s*)?(?:((?:19|20)\d{2})\b|[\'’](\d{2})\b))?',
+    re.IGNORECASE
+)
+_KVARTAL_LANG = re.compile(
+    r'\b(første|andre|tredje|fjerde|first|second|third|fourth)\s+(?:kvartal(?:et)?|quarter)\b'
+    r'(?:\s+(?:i\s+|of\s+)?((?:19|20)\d{2})\b)?',
+    re.IGNORECASE
+)
+
+# --- HJELPEFUNKSJONER ---
+
+def selskap_fra_filnavn(filnavn):
+    """Henter file_id (selskap) fra f.eks. 'full_transcripts_output/transcript_NO_4420696.txt'."""
+    base = os.path.splitext(os.path.basename(str(filnavn)))[0]
+    return base.replace("transcript_NO_", "")
+
+def utled_periode(tekst):
+    """
+    Finner første kvartal omtalt i transkripsjonen (f.eks. 'Q3 2021' eller
+    'tredje kvartal 2021'). Returnerer UKJENT_PERIODE hvis ingenting finnes.
+    """
+    if not tekst:
+        return UKJENT_PERIODE
+
+    kort = _KVARTAL_KORT.search(tekst)
+    lang = _KVARTAL_LANG.search(tekst)
+    treff = min((m for m in (kort, lang) if m), key=lambda m: m.start(), default=None)
+    if treff is None:
+        return UKJENT_PERIODE
+
+    if treff is kort:
+        kvartal = int(treff.group(1))
+        aar = treff.group(2) or (f"20{treff.group(3)}" if treff.group(3) else None)
+    else:
+        kvartal, aar = _KVARTAL_ORD[treff.group(1).lower()], treff.group(2)
+
+    return f"{aar}-Q{kvartal}" if aar else f"Q{kvartal}"
+
+def tom_kube():
+    return pd.DataFrame(columns=NOKKEL_KOLONNER + MAAL_KOLONNER)
+
+def last_kube(sti=KUBE_FIL):
+    if not os.path.exists(sti):
+        return tom_kube()
+    kube = pd.read_csv(sti, sep=';', dtype={'Run_ID': str, 'Selskap': str, 'Periode': str})
+    kube[MAAL_KOLONNER] = kube[MAAL_KOLONNER].fillna(0).astype('int64')
+    return kube
+
+def lagre_kube(kube, sti=KUBE_FIL):
+    kube.to_csv(sti, index=False, sep=';')
+
+def _til_lang_form(resultater, run_id):
+    """Gjør om brede resultatrader (én kolonne per kategori) til én rad per (fil, kategori)."""
+    df = resultater.rename(columns={"Forretningsstabilitet": "Stabilitet"})
+    kategorier = [k for k in KATEGORIER if k in df.columns]
+
+    if 'Selskap' not in df.columns:
+        df = df.assign(Selskap=df['Filnavn'].map(selskap_fra_filnavn))
+    if 'Periode' not in df.columns:
+        df = df.assign(Periode=UKJENT_PERIODE)
+
+    lang = df.melt(id_vars=['Selskap', 'Periode'], value_vars=kategorier,
+                   var_name='Kategori', value_name='Score')
+    lang = lang.dropna(subset=['Score'])
+    lang['Score'] = lang['Score'].astype('int64')
+    lang['Run_ID'] = str(run_id)
+    lang['Periode'] = lang['Periode'].fillna(UKJENT_PERIODE)
+    return lang
+
+def aggreger(resultater, run_id):
+    """Bygger kube-celler (antall, sum, kvadratsum og histogram) fra nye resultatrader."""
+    lang = _til_lang_form(resultater, run_id)
+    if lang.empty:
+        return tom_kube()
+
+    score = lang['Score']
+    lang = lang.assign(Antall=1, Sum=score, Sum_Kvadrat=score * score)
+    for verdi, kolonne in zip(SCORE_VERDIER, HIST_KOLONNER):
+        lang[kolonne] = (score == verdi).astype('int64')
+
+    return lang.groupby(NOKKEL_KOLONNER, as_index=False)[MAAL_KOLONNER].sum()
+
+def oppdater_kube(kube, resultater, run_id):
+    """
+    Legger nye resultatrader inn i kuben inkrementelt. Bare de nye radene
+    aggregeres; de legges til eksisterende celler med samme nøkkel, og nye
+    nøkler legges til sist (uten å summere hele historikken på nytt).
+    """
+    nye_celler = aggreger(resultater, run_id)
+    if nye_celler.empty:
+        return kube
+    if kube.empty:
+        return nye_celler
+
+    kube = kube.set_index(NOKKEL_KOLONNER)
+    nye_celler = nye_celler.set_index(NOKKEL_KOLONNER)
+    felles = nye_celler.index.intersection(kube.index)
+    if len(felles):
+        kube.loc[felles, MAAL_KOLONNER] += nye_celler.loc[felles, MAAL_KOLONNER]
+    nye_nokler = nye_celler.index.difference(kube.index)
+    return pd.concat([kube, nye_celler.loc[nye_nokler, MAAL_KOLONNER]]).reset_index()
+
+def erstatt_run(kube, resultater, run_id):
+    """Fjerner alle celler for run_id og bygger dem på nytt fra resultatene."""
+    if not kube.empty:
+        kube = kube[kube['Run_ID'] != str(run_id)]
+    return oppdater_kube(kube, resultater, run_id)
+
+def filtrer(kube, run_id=None, selskap=None, periode=None, kategori=None):
+    """Filtrerer kuben. Hvert filter kan være en enkelt verdi eller en liste."""
+    maske = pd.Series(True, index=kube.index)
+    for kolonne, verdi in (('Run_ID', run_id), ('Selskap', selskap),
+                           ('Periode', periode), ('Kategori', kategori)):
+        if verdi is None:
+            continue
+        verdier = list(verdi) if isinstance(verdi, (list, tuple, set)) else [verdi]
+        maske &= kube[kolonne].isin([str(v) for v in verdier])
+    return kube[maske]
+
+def rull_opp(kube, etter=('Kategori',), **filtre):
+    """
+    Summerer kuben opp til nivået i `etter` (f.eks. ('Selskap', 'Kategori'))
+    og regner ut snitt og standardavvik fra antall, sum og kvadratsum.
+    """
+    utvalg = filtrer(kube, **filtre)
+    etter = list(etter)
+    if utvalg.empty:
+        return pd.DataFrame(columns=etter + MAAL_KOLONNER + ['Snitt', 'Std'])
+
+    rull = utvalg.groupby(etter, as_index=False)[MAAL_KOLONNER].sum()
+    antall = rull['Antall'].where(rull['Antall'] > 0)
+    rull['Snitt'] = rull['Sum'] / antall
+    varians = (rull['Sum_Kvadrat'] / antall - rull['Snitt'] ** 2).clip(lower=0)
+    rull['Std'] = varians ** 0.5
+    return rull
+
+def snitt_per_kategori(kube, kategorier=None, **filtre):
+    """Snittscore per kategori, tilsvarende df[kategorier].mean() over rådata."""
+    rull = rull_opp(kube, etter=('Kategori',), **filtre).set_index('Kategori')['Snitt']
+    if kategorier is not None:
+        rull = rull.reindex(kategorier)
+    return rull
+
+def fordeling(kube, kategori, **filtre):
+    """Antall per score (-2..+2) for én kategori, tilsvarende en countplot over rådata."""
+    utvalg = filtrer(kube, kategori=kategori, **filtre)
+    antall = utvalg[HIST_KOLONNER].sum() if not utvalg.empty else pd.Series(0, index=HIST_KOLONNER)
+    return pd.Series(antall.values, index=SCORE_VERDIER, name=kategori).astype('int64')
+
+def siste_run(kube):
+    """Run_ID for den sist tilførte kjøringen i kuben (rekkefølgen i filen)."""
+    if kube.empty:
+        return None
+    return kube['Run_ID'].iloc[-1]
+
+def filhash(sti):
+    h = hashlib.md5()
+    with open(sti, 'rb') as f:
+        for blokk in iter(lambda: f.read(1 << 20), b''):
+            h.update(blokk)
+    return h.hexdigest()
+
+def _kilde_sti(sti=KUBE_FIL):
+    return os.path.splitext(sti)[0] + "_kilder.json"
+
+def last_kilder(sti=KUBE_FIL):
+    """md5 av resultatfil -> Run_ID for kjøringen som skrev den."""
+    if not os.path.exists(_kilde_sti(sti)):
+        return {}
+    with open(_kilde_sti(sti), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def registrer_resultatfil(run_id, resultat_fil='analyse_resultater.csv', sti=KUBE_FIL):
+    """
+    Noterer at resultatfilen (slik den er nå) ble skrevet av run_id, som allerede
+    ligger i kuben. Da bygges det ikke en egen 'resultatfil-*'-kopi av de samme radene.
+    """
+    kilder = last_kilder(sti)
+    kilder[filhash(resultat_fil)] = str(run_id)
+    with open(_kilde_sti(sti), 'w', encoding='utf-8') as f:
+        json.dump(kilder, f, indent=2)
+
+def gjeldende_run(kube, resultat_fil='analyse_resultater.csv', sti=KUBE_FIL):
+    """Run_ID som tilsvarer gjeldende resultatfil; siste kjøring i kuben hvis ukjent."""
+    if kube.empty or not os.path.exists(resultat_fil):
+        return siste_run(kube)
+    md5 = filhash(resultat_fil)
+    for run_id in (last_kilder(sti).get(md5), f"{RESULTATFIL_PREFIKS}-{md5[:12]}"):
+        if run_id and (kube['Run_ID'] == run_id).any():
+            return run_id
+    return siste_run(kube)
+
+def last_eller_bygg_kube(resultat_fil='analyse_resultater.csv', sti=KUBE_FIL):
+    """
+    Laster kuben fra disk og sørger for at den dekker gjeldende resultatfil.
+    Er filen skrevet av en kjøring som allerede ligger i kuben (registrer_resultatfil),
+    brukes den. Ellers (eldre fil, dvc pull) speiles den som Run_ID 'resultatfil-<md5>',
+    som erstatter en eventuell tidligere speiling.
+    """
+    kube = last_kube(sti)
+    if not os.path.exists(resultat_fil):
+        return kube
+
+    md5 = filhash(resultat_fil)
+    kjent_run = last_kilder(sti).get(md5)
+    run_id = f"{RESULTATFIL_PREFIKS}-{md5[:12]}"
+    if not kube.empty and kube['Run_ID'].isin([kjent_run, run_id]).any():
+        return kube
+
+    if not kube.empty:
+        kube = kube[~kube['Run_ID'].str.startswith(RESULTATFIL_PREFIKS)]
+    resultater = pd.read_csv(resultat_fil, sep=';')
+    kube = oppdater_kube(kube, resultater, run_id)
+    lagre_kube(kube, sti)
+    return kube
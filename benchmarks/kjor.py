@@ -0,0 +1,169 @@
+"""
+Offline CPU-benchmarks for pipelinens deler som ikke kaller LLM-en.
+
+    python -m benchmarks.kjor                    # kjør og sammenlign mot baseline
+    python -m benchmarks.kjor --lagre-baseline   # kjør og lagre ny baseline
+    python -m benchmarks.kjor --rask             # bare små størrelser
+
+Måler tid (beste av N repetisjoner) og toppminne (tracemalloc) per case, og
+avslutter med kode 1 hvis et case er tregere eller bruker mer minne enn
+baseline + terskel.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from benchmarks import syntetiske_data as syn
+
+# --- KONFIGURASJON ---
+BASELINE_FIL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+TERSKEL = 0.25            # 25 % tregere / mer minne enn baseline regnes som regresjon
+MIN_TID_DIFF = 0.005      # sekunder; forskjeller under dette regnes som støy
+MIN_MINNE_DIFF = 1.0      # MB
+RASK_MAKS = 10_000
+
+# --- Caser ---
+
+def _stille(func, *args):
+    """Kjører func uten utskrift (fremdriftslinjene i pipelinen forstyrrer målingene)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+def bygg_caser():
+    """Returnerer liste av (navn, størrelse, forbered(n) -> data, kjør(data))."""
+    ekstraktor = importlib.import_module('1_extract_data')
+    scorer = importlib.import_module('2_call_google')
+    visualisering = importlib.import_module('3_visualization')
+    evaluering = importlib.import_module('evaluering')
+    kube = importlib.import_module('aggregat_kube')
+    parser = importlib.import_module('score_parser')
+
+    def forbered_gruppert(n):
+        return dict(_stille(ekstraktor.group_segments, syn.segmenter(n), 26))
+
+    def rekonstruer_alle(gruppert):
+        for data in gruppert.values():
+            ekstraktor.reconstruct_transcript(data['segments'])
+
+    def filfilter(logg):
+        fil = logg['Filnavn'].iloc[-1]
+        for kategori in syn.KATEGORIER:
+            evaluering.siste_vurdering(logg, fil, kategori)
+
+    def forbered_kube(n):
+        return kube.aggreger(syn.resultater(n), 'bench')
+
+    caser = []
+    for n in (1_000, 10_000, 100_000, 1_000_000):
+        caser.append(('segmenter.grupper', n, syn.segmenter,
+                      lambda segs: _stille(ekstraktor.group_segments, segs, 26)))
+        caser.append(('segmenter.rekonstruer', n, forbered_gruppert, rekonstruer_alle))
+    for n in (1_000, 10_000, 100_000):
+        caser.append(('parsing.drivere', n, syn.driver_svar,
+                      lambda svar: [scorer.parse_driver_scores(s) for s in svar]))
+        caser.append(('parsing.stabilitet', n, syn.stabilitet_svar,
+                      lambda svar: [scorer.parse_stability_score(s) for s in svar]))
+        caser.append(('parsing.batch', n, syn.raa_svar, parser.parse_raa_svar))
+    for n in (10, 1_000, 10_000, 100_000):
+        caser.append(('evaluering.metrikker', n, syn.evalueringslogg, evaluering.beregn_metrikker))
+        caser.append(('evaluering.filfilter', n, syn.evalueringslogg, filfilter))
+    for n in (100, 10_000, 100_000):
+        caser.append(('figur.kube_oppdatering', n, syn.resultater,
+                      lambda df: kube.oppdater_kube(kube.tom_kube(), df, 'bench')))
+        caser.append(('figur.beregn', n, forbered_kube,
+                      lambda k: visualisering.beregn_figurdata(k, dict(run_id='bench'))))
+    return caser
+
+# --- Måling ---
+
+def _kopi(data):
+    """Grunn kopi av grupperte segmenter (reconstruct_transcript sorterer listene på stedet)."""
+    if isinstance(data, dict):
+        return {k: {'segments': list(v['segments'])} for k, v in data.items()}
+    return data
+
+def mal(forbered, kjor, n, repetisjoner):
+    """Beste tid over `repetisjoner` kjøringer og toppminne i MB for én ekstra kjøring."""
+    data = forbered(n)
+    beste = float('inf')
+    for _ in range(repetisjoner):
+        kopi = _kopi(data)
+        start = time.perf_counter()
+        kjor(kopi)
+        beste = min(beste, time.perf_counter() - start)
+
+    kopi = _kopi(data)
+    tracemalloc.start()
+    kjor(kopi)
+    _, topp = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return beste, topp / 1024 ** 2
+
+def sammenlign(resultater, baseline, terskel):
+    """Returnerer liste over regresjoner (tekst) mot baseline."""
+    regresjoner = []
+    for nokkel, naa in resultater.items():
+        gammel = baseline.get(nokkel)
+        if not gammel:
+            continue
+        if naa['sek'] > gammel['sek'] * (1 + terskel) and naa['sek'] - gammel['sek'] > MIN_TID_DIFF:
+            regresjoner.append(f"{nokkel}: tid {gammel['sek']:.4f}s -> {naa['sek']:.4f}s")
+        if naa['topp_mb'] > gammel['topp_mb'] * (1 + terskel) and naa['topp_mb'] - gammel['topp_mb'] > MIN_MINNE_DIFF:
+            regresjoner.append(f"{nokkel}: minne {gammel['topp_mb']:.1f}MB -> {naa['topp_mb']:.1f}MB")
+    return regresjoner
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks.kjor', description="Offline benchmarks for helsemonitor.")
+    parser.add_argument('--lagre-baseline', action='store_true', help="Lagre resultatene som ny baseline.")
+    parser.add_argument('--baseline', default=BASELINE_FIL, help="Sti til baseline-fil.")
+    parser.add_argument('--terskel', type=float, default=TERSKEL, help="Tillatt forverring (0.25 = 25 %%).")
+    parser.add_argument('--repetisjoner', type=int, default=3, help="Antall tidsmålinger per case.")
+    parser.add_argument('--rask', action='store_true', help=f"Bare størrelser opp til {RASK_MAKS:,}.")
+    parser.add_argument('--filter', default='', help="Kjør bare caser der navnet inneholder denne teksten.")
+    args = parser.parse_args(argv)
+
+    resultater = {}
+    print(f"{'Case':<32}{'N':>11}{'Tid (s)':>12}{'Topp (MB)':>12}")
+    for navn, n, forbered, kjor in bygg_caser():
+        if args.filter not in navn or (args.rask and n > RASK_MAKS):
+            continue
+        sek, topp_mb = mal(forbered, kjor, n, args.repetisjoner)
+        resultater[f"{navn}[{n}]"] = {'sek': sek, 'topp_mb': topp_mb}
+        print(f"{navn:<32}{n:>11,}{sek:>12.4f}{topp_mb:>12.1f}")
+
+    if args.lagre_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'maskin': platform.platform(),
+                       'resultater': resultater}, f, indent=2)
+        print(f"\nBaseline lagret i {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nIngen baseline funnet ({args.baseline}). Kjør med --lagre-baseline.")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['resultater']
+
+    regresjoner = sammenlign(resultater, baseline, args.terskel)
+    if regresjoner:
+        print(f"\n❌ {len(regresjoner)} regresjon(er) over {args.terskel:.0%}:")
+        for linje in regresjoner:
+            print(f"   {linje}")
+        return 1
+
+    print(f"\n✅ Ingen regresjoner over {args.terskel:.0%} mot baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Syntetiske data for benchmarkene. Alt genereres lokalt med fast seed (ingen nettverk)."""
+import random
+
+import numpy as np
+import pandas as pd
+
+KATEGORIER = [
+    "Stabilitet", "Makroforhold", "Forsyningskjede",
+    "Produksjonskvalitet", "Kompetanse", "Etterspørselsmønstre",
+    "Prismakt", "Strategigjennomføring"
+]
+DRIVERE = KATEGORIER[1:]
+
+_ORD = ("omsetning", "margin", "kvartal", "etterspørsel", "leverandør", "kunder",
+        "vekst", "kostnader", "produksjon", "strategi", "marked", "prisøkning")
+
+
+def filnavn(i):
+    return f"full_transcripts_output/transcript_NO_{4420000 + i}.txt"
+
+
+def segmenter(n_segmenter, n_samtaler=26, seed=0):
+    """Segmenter i samme form som earnings22 'chunked', i tilfeldig rekkefølge innen hver samtale."""
+    rng = random.Random(seed)
+    per_samtale = max(1, n_segmenter // n_samtaler)
+    resultat = []
+    for i in range(n_segmenter):
+        samtale = min(i // per_samtale, n_samtaler - 1)
+        start = rng.uniform(0, per_samtale * 10)
+        resultat.append({
+            'file_id': str(4420000 + samtale),
+            'transcription': " ".join(rng.choices(_ORD, k=12)),
+            'start_ts': start,
+            'end_ts': start + rng.uniform(1, 10),
+        })
+    return resultat
+
+
+def driver_svar(n_svar, seed=0):
+    """Modellsvar i blandet format: rene lister, 'Kategori: score'-linjer og støy med år/kvartal."""
+    rng = random.Random(seed)
+    svar = []
+    for i in range(n_svar):
+        scores = [rng.randint(-2, 2) for _ in DRIVERE]
+        variant = i % 3
+        if variant == 0:
+            svar.append(", ".join(str(s) for s in scores))
+        elif variant == 1:
+            svar.append("\n".join(f"{j + 1}. {navn}: {s:+d}" for j, (navn, s) in enumerate(zip(DRIVERE, scores))))
+        else:
+            svar.append(f"Basert på Q3 2021 vurderes driverne slik: {' '.join(str(s) for s in scores)}")
+    return svar
+
+
+def stabilitet_svar(n_svar, seed=0):
+    rng = random.Random(seed)
+    maler = ("{s}", "Forretningsstabilitet: {s}", "Score for 2022: {s}")
+    return [maler[i % len(maler)].format(s=rng.randint(-2, 2)) for i in range(n_svar)]
+
+
+def raa_svar(n_filer, seed=0):
+    """Rå modellsvar per fil slik de lagres i raa_svar/<run_id>.parquet."""
+    return pd.DataFrame({
+        'Filnavn': [filnavn(i) for i in range(n_filer)],
+        'Periode': [f"{2019 + i % 4}-Q{1 + i % 4}" for i in range(n_filer)],
+        'Stabilitet_Svar': stabilitet_svar(n_filer, seed),
+        'Driver_Svar': driver_svar(n_filer, seed),
+    })
+
+
+def resultater(n_filer, seed=0):
+    """Brede resultatrader slik 2_call_google.main skriver dem (én kolonne per kategori)."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.integers(-2, 3, size=(n_filer, len(KATEGORIER))), columns=KATEGORIER)
+    df.insert(0, 'Filnavn', [filnavn(i % max(1, n_filer // 4)) for i in range(n_filer)])
+    df.insert(1, 'Periode', [f"{2019 + i % 4}-Q{1 + i % 4}" for i in range(n_filer)])
+    return df
+
+
+def evalueringslogg(n_rader, seed=0):
+    """Evalueringslogg i samme format som evaluering_logg.csv, med revisjoner (duplikater)."""
+    rng = np.random.default_rng(seed)
+    n_filer = max(1, n_rader // len(KATEGORIER))
+    filer = rng.integers(0, n_filer, size=n_rader)
+    model = rng.integers(-2, 3, size=n_rader)
+    enig = rng.random(n_rader) < 0.7
+    return pd.DataFrame({
+        'Filnavn': [filnavn(int(f)) for f in filer],
+        'Kategori': rng.choice(KATEGORIER, size=n_rader),
+        'Model_Score': model,
+        'Human_Score': np.where(enig, model, rng.integers(-2, 3, size=n_rader)),
+        'Kommentar': "syntetisk begrunnelse",
+    })
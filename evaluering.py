@@ -0,0 +1,153 @@
+import pandas as pd
+from sklearn.metrics import precision_score, recall_score, accuracy_score
+
+# Rene hjelpefunksjoner for evalueringsappen (ingen Streamlit her, slik at de kan
+# gjenbrukes og måles utenfor appen).
+
+def beregn_metrikker(logg_df):
+    if logg_df.empty: return 0, 0, 0, 0
+
+    # --- Implementert endring: Filtrer til kun den siste (reviderte) vurderingen ---
+    # Sorterer dataen implisitt etter rekkefølgen de ble lagt til (som er den siste) 
+    # og beholder kun den siste vurderingen for hver unike kombinasjon av Filnavn og Kategori.
+    logg_df_siste = logg_df.drop_duplicates(subset=['Filnavn', 'Kategori'], keep='last')
+    
+    if logg_df_siste.empty: return 0, 0, 0, 0
+    
+    y_true = logg_df_siste['Human_Score'].astype(int)
+    y_pred = logg_df_siste['Model_Score'].astype(int)
+    
+    precision = precision_score(y_true, y_pred, average='weighted', zero_division=0)
+    recall = recall_score(y_true, y_pred, average='weighted', zero_division=0)
+    accuracy = accuracy_score(y_true, y_pred)
+    antall_filer = logg_df_siste['Filnavn'].nunique() # Bruker den filtrerte DFen
+    
+    return precision, recall, accuracy, antall_filer
+    # --- Slutt på implementert endring ---
+
+def siste_vurdering(logg_df, filnavn, kategori):
+    """Siste lagrede vurdering for (filnavn, kategori), eller None hvis den ikke finnes."""
+    if logg_df.empty: return None
+    eksisterende_rad = logg_df[(logg_df['Filnavn'] == filnavn) & (logg_df['Kategori'] == kategori)]
+    if eksisterende_rad.empty: return None
+    return eksisterende_rad.iloc[-1]
+
+# --- PRIORITETSKØ FOR AKTIV GJENNOMGANG ---
+
+DRIVERE = [
+    "Makroforhold", "Forsyningskjede", "Produksjonskvalitet", "Kompetanse",
+    "Etterspørselsmønstre", "Prismakt", "Strategigjennomføring"
+]
+KATEGORIER = ["Stabilitet"] + DRIVERE
+
+# Hvor mye hvert signal teller i prioriteten (alle signaler er skalert til 0..1)
+PRIORITET_VEKTER = {
+    'Ekstrem': 1.0,        # andel kategorier med score -2 eller +2
+    'Utfylt': 1.5,         # andel driver-scorer som er fylt ut med 0 (parse-feil)
+    'Uenighet': 1.0,       # avstand mellom snitt av drivere og overordnet stabilitet
+    'Lav_Konfidens': 1.0,  # 1 - Parse_Konfidens (hvis tilgjengelig)
+    'Kategori_Feil': 2.0,  # forventet andel uenighet menneske/modell, fra loggen så langt
+}
+
+def _statiske_signaler(df):
+    """Signaler som bare avhenger av modellens resultater, beregnes én gang per resultatfil."""
+    df = df.rename(columns={"Forretningsstabilitet": "Stabilitet"}).drop_duplicates('Filnavn', keep='last')
+    df = df.set_index('Filnavn')
+    scorer = df[KATEGORIER].astype(int)
+    drivere = scorer[DRIVERE]
+
+    if 'Antall_Utfylt' in df.columns:
+        utfylt = df['Antall_Utfylt'].fillna(0)
+    else:
+        # Uten parse-info: nuller på slutten av driverlisten tyder på utfylling
+        utfylt = (drivere.iloc[:, ::-1] != 0).cumsum(axis=1).eq(0).sum(axis=1)
+        utfylt = utfylt.where(utfylt >= 2, 0)
+
+    signaler = pd.DataFrame({
+        'Ekstrem': (scorer.abs() == 2).mean(axis=1),
+        'Utfylt': utfylt / len(DRIVERE),
+        'Uenighet': (drivere.mean(axis=1) - scorer['Stabilitet']).abs() / 4,
+        'Lav_Konfidens': 1 - df['Parse_Konfidens'].fillna(1) if 'Parse_Konfidens' in df.columns else 0.0,
+    }, index=df.index)
+
+    lang = scorer.reset_index().melt(id_vars='Filnavn', var_name='Kategori', value_name='Model_Score')
+    return signaler, lang
+
+def bygg_prioritetsindeks(df, logg_df):
+    """
+    Bygger prioritetsindeksen for filer som venter på vurdering. Statiske
+    signaler og prioriteten per fil beregnes her én gang; oppdater_prioritetsindeks
+    holder feiltabellen per (Kategori, Model_Score) oppdatert etter hver lagring
+    og regner bare prioriteten på nytt for filene som har en endret celle.
+    """
+    signaler, lang = _statiske_signaler(df)
+    statisk = sum(signaler[navn] * vekt for navn, vekt in PRIORITET_VEKTER.items() if navn != 'Kategori_Feil')
+
+    celler = {}
+    for fil, kategori, model in lang[['Filnavn', 'Kategori', 'Model_Score']].itertuples(index=False):
+        celler.setdefault((kategori, int(model)), []).append(fil)
+    antall_kategorier = lang.groupby('Filnavn').size()
+
+    indeks = {
+        'statisk': statisk,   # vektet sum av de statiske signalene per fil
+        'celler': celler,     # (Kategori, Model_Score) -> filer med den scoren
+        'antall_kategorier': antall_kategorier.to_dict(),
+        'kategori_sum': (antall_kategorier * 0.5).to_dict(),  # sum av rate over filens kategorier
+        'rate': {},           # (Kategori, Model_Score) -> forventet uenighet; 0.5 uten data
+        'prioritet': statisk + PRIORITET_VEKTER['Kategori_Feil'] * 0.5,
+        'siste': {},          # (Filnavn, Kategori) -> (Model_Score, Human_Score)
+        'feil': {},           # (Kategori, Model_Score) -> [antall, antall_uenige]
+        'ferdig': set(),
+        'antall_logg': 0,
+    }
+    return oppdater_prioritetsindeks(indeks, logg_df)
+
+def oppdater_prioritetsindeks(indeks, nye_rader):
+    """
+    Tar inn nye loggrader inkrementelt. Reviderte vurderinger erstatter den forrige
+    i statistikken. Kategori_Feil er forventet uenighet for filens scorer, med
+    Beta(1,1)-prior: (uenige + 1) / (antall + 2), og prioriteten oppdateres bare
+    for filene som har en score i en celle som endret seg.
+    """
+    endret = set()
+    for fil, kategori, model, human in nye_rader[['Filnavn', 'Kategori', 'Model_Score', 'Human_Score']].itertuples(index=False):
+        nokkel = (fil, kategori)
+        forrige = indeks['siste'].get(nokkel)
+        if forrige is not None:
+            celle = indeks['feil'][(kategori, forrige[0])]
+            celle[0] -= 1
+            celle[1] -= int(forrige[0] != forrige[1])
+            endret.add((kategori, forrige[0]))
+
+        model, human = int(model), int(human)
+        celle = indeks['feil'].setdefault((kategori, model), [0, 0])
+        celle[0] += 1
+        celle[1] += int(model != human)
+        endret.add((kategori, model))
+        indeks['siste'][nokkel] = (model, human)
+        indeks['ferdig'].add(fil)
+
+    berorte = set()
+    for celle in endret:
+        antall, uenige = indeks['feil'][celle]
+        rate = (uenige + 1) / (antall + 2)
+        forrige_rate = indeks['rate'].get(celle, 0.5)
+        if rate == forrige_rate:
+            continue
+        indeks['rate'][celle] = rate
+        for fil in indeks['celler'].get(celle, ()):
+            indeks['kategori_sum'][fil] += rate - forrige_rate
+            berorte.add(fil)
+
+    if berorte:
+        kategori_feil = pd.Series({fil: indeks['kategori_sum'][fil] / indeks['antall_kategorier'][fil] for fil in berorte})
+        indeks['prioritet'].loc[kategori_feil.index] = (indeks['statisk'].loc[kategori_feil.index]
+                                                        + PRIORITET_VEKTER['Kategori_Feil'] * kategori_feil)
+
+    indeks['antall_logg'] += len(nye_rader)
+    return indeks
+
+def prioriter(indeks, filer):
+    """Sorterer filene etter den lagrede prioriteten (høyest først). Ukjente filer får bare Kategori_Feil-prioren."""
+    prioritet = indeks['prioritet'].reindex(list(filer)).fillna(PRIORITET_VEKTER['Kategori_Feil'] * 0.5)
+    return prioritet.sort_values(ascending=False, kind='stable')
@@ -0,0 +1,210 @@
+"""
+Felles inngang til pipelinen:
+
+    python helsemonitor.py extract | translate | score | rescore | report | evaluate | run
+
+Tunge avhengigheter (datasets, google.generativeai, mlflow, matplotlib,
+streamlit) importeres først inne i underkommandoen som trenger dem, slik at
+`--help` starter raskt. `run` kjører alle stegene i rekkefølge og hopper over
+steg der hashen av input og output er uendret siden forrige kjøring. Steg uten
+lagret state, men med eksisterende output (f.eks. rett etter `dvc pull`), tas i
+bruk som de er; `--force` kjører dem på nytt.
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import subprocess
+import sys
+
+# --- KONFIGURASJON ---
+STATE_FIL = '.helsemonitor_state.json'
+FIGUR_FIL = 'rapport.png'
+APP_FIL = '4_evaluation_app.py'
+
+STEG = ['extract', 'translate', 'score', 'report']
+
+# --- Hjelpefunksjoner ---
+
+def last_modul(navn):
+    """Importerer et av de nummererte skriptene (f.eks. '2_call_google') ved behov."""
+    return importlib.import_module(navn)
+
+def hash_verdier(*verdier):
+    data = json.dumps(verdier, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def hash_sti(sti):
+    """Hash av innholdet i en fil eller alle filer i en mappe. None hvis stien ikke finnes."""
+    if not os.path.exists(sti):
+        return None
+
+    h = hashlib.sha256()
+    if os.path.isfile(sti):
+        filer = [sti]
+    else:
+        filer = sorted(os.path.join(rot, f) for rot, _, navn in os.walk(sti) for f in navn)
+
+    for fil in filer:
+        h.update(os.path.relpath(fil, sti).encode('utf-8'))
+        with open(fil, 'rb') as f:
+            for blokk in iter(lambda: f.read(1 << 20), b''):
+                h.update(blokk)
+    return h.hexdigest()
+
+def last_state():
+    if os.path.exists(STATE_FIL):
+        with open(STATE_FIL, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def lagre_state(state):
+    with open(STATE_FIL, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+# --- Underkommandoer ---
+
+def cmd_extract(args):
+    ekstraktor = last_modul('1_extract_data')
+    ekstraktor.extract_transcripts(ekstraktor.DATASET_NAME, ekstraktor.SPLIT,
+                                   ekstraktor.CONFIG_NAME, args.num_calls or ekstraktor.NUM_CALLS_TO_PROCESS)
+
+def cmd_translate(args):
+    last_modul('1_extract_data').translate_transcripts()
+
+def cmd_score(args):
+    last_modul('2_call_google').main()
+
+def cmd_rescore(args):
+    from score_parser import rescore_run
+    rescore_run(args.run_id)
+
+def cmd_report(args):
+    last_modul('3_visualization').main(figur_fil=args.figur)
+
+def cmd_evaluate(args):
+    return subprocess.call([sys.executable, '-m', 'streamlit', 'run', APP_FIL] + args.streamlit_args)
+
+# --- Steg for `run` (input som hashes, output som sjekkes) ---
+
+def steg_definisjon(navn):
+    """Returnerer (input_hash, output_sti) for et steg. Modulene importeres uten tunge avhengigheter."""
+    if navn in ('extract', 'translate'):
+        ekstraktor = last_modul('1_extract_data')
+        if navn == 'extract':
+            inn = hash_verdier(ekstraktor.DATASET_NAME, ekstraktor.SPLIT,
+                               ekstraktor.CONFIG_NAME, ekstraktor.NUM_CALLS_TO_PROCESS)
+            return inn, ekstraktor.EN_OUTPUT_DIR
+        inn = hash_verdier(hash_sti(ekstraktor.EN_OUTPUT_DIR), ekstraktor.GEMINI_MODEL_NAME,
+                           ekstraktor.TRANSLATION_PROMPT)
+        return inn, ekstraktor.OUTPUT_DIR
+
+    if navn == 'score':
+        scorer = last_modul('2_call_google')
+        inn = hash_verdier(hash_sti(scorer.TRANSCRIPT_DIR), hash_sti(scorer.PROMPT_DIR), scorer.MODEL_NAME)
+        return inn, scorer.OUTPUT_FILENAME
+
+    if navn == 'report':
+        # Synkroniser kuben med resultatfilen først, slik at hashen ikke endres av
+        # at cmd_report selv bygger kuben.
+        from aggregat_kube import KUBE_FIL, last_eller_bygg_kube
+        last_eller_bygg_kube('analyse_resultater.csv')
+        return hash_verdier(hash_sti('analyse_resultater.csv'), hash_sti(KUBE_FIL)), FIGUR_FIL
+
+    raise ValueError(f"Ukjent steg: {navn}")
+
+def er_oppdatert(state, navn, inn, ut):
+    forrige = state.get(navn)
+    if not forrige or forrige.get('input') != inn:
+        return False
+    ut_hash = hash_sti(ut)
+    return ut_hash is not None and ut_hash == forrige.get('output')
+
+def ufullstendig_output(navn):
+    """Filer i stegets output som ikke kan regnes som ferdige (mislykkede oversettelser)."""
+    if navn == 'translate':
+        ekstraktor = last_modul('1_extract_data')
+        return ekstraktor.failed_translations(ekstraktor.OUTPUT_DIR)
+    return []
+
+def cmd_run(args):
+    state = last_state()
+    steg_args = argparse.Namespace(num_calls=None, figur=FIGUR_FIL)
+    kjorere = {'extract': cmd_extract, 'translate': cmd_translate,
+               'score': cmd_score, 'report': cmd_report}
+
+    for navn in STEG[STEG.index(args.fra):]:
+        inn, ut = steg_definisjon(navn)
+        if not args.force and er_oppdatert(state, navn, inn, ut):
+            print(f"⏭️  {navn}: oppdatert, hopper over.")
+            continue
+
+        # Output uten state (ny checkout, dvc pull): ta den i bruk i stedet for å
+        # slette den og betale for API-kallene på nytt
+        kjor = args.force or navn in state or hash_sti(ut) is None
+        if kjor:
+            print(f"▶️  {navn}: kjører...")
+            kjorere[navn](steg_args)
+
+        if hash_sti(ut) is None:
+            print(f"❌ {navn}: fant ikke output '{ut}'. Stopper.")
+            return 1
+
+        mangler = ufullstendig_output(navn)
+        if mangler:
+            print(f"❌ {navn}: {len(mangler)} fil(er) i '{ut}' er ikke ferdige: {', '.join(mangler)}. "
+                  f"Kjør steget på nytt med `run --fra {navn} --force`. Stopper.")
+            return 1
+
+        if not kjor:
+            print(f"⏭️  {navn}: fant eksisterende output '{ut}' uten lagret state; tar den i bruk. "
+                  f"Bruk --force for å kjøre steget på nytt.")
+
+        state[navn] = {'input': inn, 'output': hash_sti(ut)}
+        lagre_state(state)
+
+    print("✅ Pipelinen er oppdatert.")
+    return 0
+
+# --- CLI ---
+
+def bygg_parser():
+    parser = argparse.ArgumentParser(prog='helsemonitor', description="Organisatorisk helsemonitor med KI.")
+    sub = parser.add_subparsers(dest='kommando', required=True)
+
+    p = sub.add_parser('extract', help="Rekonstruer transkripsjoner (EN) fra datasettet.")
+    p.add_argument('--num-calls', type=int, default=None, help="Antall samtaler (standard: NUM_CALLS_TO_PROCESS).")
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser('translate', help="Oversett EN-transkripsjonene til norsk.")
+    p.set_defaults(func=cmd_translate)
+
+    p = sub.add_parser('score', help="Score transkripsjonene med Gemini og logg til MLflow.")
+    p.set_defaults(func=cmd_score)
+
+    p = sub.add_parser('rescore', help="Re-score en kjøring fra lagrede rå svar (ingen API-kall).")
+    p.add_argument('run_id', help="MLflow Run ID for kjøringen som skal re-scores.")
+    p.set_defaults(func=cmd_rescore)
+
+    p = sub.add_parser('report', help="Tegn figurene fra aggregatkuben.")
+    p.add_argument('--figur', default=None, help="Lagre figuren til fil i stedet for å vise den.")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser('evaluate', help="Start evalueringsappen (Streamlit).")
+    p.add_argument('streamlit_args', nargs=argparse.REMAINDER, help="Ekstra argumenter til streamlit.")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser('run', help="Kjør alle steg og hopp over de som er oppdatert.")
+    p.add_argument('--force', action='store_true', help="Kjør alle steg uansett.")
+    p.add_argument('--fra', choices=STEG, default=STEG[0], help="Start fra dette steget.")
+    p.set_defaults(func=cmd_run)
+
+    return parser
+
+def main(argv=None):
+    args = bygg_parser().parse_args(argv)
+    return args.func(args) or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
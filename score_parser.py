@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import pandas as pd
+from aggregat_kube import erstatt_run, last_kube, lagre_kube, registrer_resultatfil
+
+# --- KONFIGURASJON ---
+RAA_SVAR_DIR = "raa_svar"
+RESULTAT_FIL = "analyse_resultater.csv"
+
+DRIVERE = [
+    "Makroforhold", "Forsyningskjede", "Produksjonskvalitet", "Kompetanse",
+    "Etterspørselsmønstre", "Prismakt", "Strategigjennomføring"
+]
+STABILITET = "Forretningsstabilitet"
+
+MIN_SCORE, MAX_SCORE = -2, 2
+# Heltall med |verdi| over dette (år, beløp, prosent osv.) regnes ikke som scorer i det hele tatt.
+MAKS_SCORELIGNENDE = 9
+
+# Frittstående heltall: ikke del av et ord (Q3, 3rd), et desimaltall (2.5) eller
+# et intervall (2021-2022), og ikke etterfulgt av %.
+TALL_MONSTER = r'(?<![\w.+\-−])([+\-−]?\d+)(?![\w%]|\.\d)'
+# Nummerering i starten av en linje ("1. Makroforhold: -1", "2) ...") fjernes før parsing.
+OPPLISTING_MONSTER = r'(?m)^\s*\d+[.)]\s+'
+
+_TALL = re.compile(TALL_MONSTER)
+_OPPLISTING = re.compile(OPPLISTING_MONSTER)
+
+# --- Hjelpefunksjoner ---
+
+def _tolk(tekst, forventet):
+    """
+    Felles regler for ett svar. Alle scorelignende tall (|verdi| <= MAKS_SCORELIGNENDE)
+    får hver sin plass i rekkefølge; tall utenfor -2..+2 blir None på sin egen plass,
+    slik at senere drivere ikke forskyves. Returnerer (plasser, antall tall, antall utenfor).
+    """
+    renset = _OPPLISTING.sub(" ", tekst).replace("−", "-")
+    plasser, antall_tall, antall_utenfor = [], 0, 0
+    for token in _TALL.findall(renset):
+        if len(token) > 4 or abs(int(token)) > MAKS_SCORELIGNENDE:
+            continue
+        verdi = int(token)
+        gyldig = MIN_SCORE <= verdi <= MAX_SCORE
+        antall_tall += 1
+        antall_utenfor += not gyldig
+        if len(plasser) < forventet:
+            plasser.append(verdi if gyldig else None)
+    return plasser + [None] * (forventet - len(plasser)), antall_tall, antall_utenfor
+
+def parse_svar(svar, forventet):
+    """
+    Parser en hel kolonne med modellsvar etter reglene i _tolk. Returnerer én rad
+    per svar med kolonnene Score_0..Score_{forventet-1} (Int64, <NA> for manglende
+    eller ugyldige plasser), antall tall, anomaliflagg og en Parse_Konfidens mellom 0 og 1.
+    """
+    tekst = svar.fillna("").astype(str)
+    tolket = [_tolk(t, forventet) for t in tekst]
+
+    scorer = pd.DataFrame([plasser for plasser, _, _ in tolket], index=svar.index,
+                          columns=[f"Score_{i}" for i in range(forventet)], dtype="Int64")
+    antall_tall = pd.Series([n for _, n, _ in tolket], index=svar.index, dtype="int64")
+    antall_utenfor = pd.Series([u for _, _, u in tolket], index=svar.index, dtype="int64")
+
+    resultat = scorer.assign(
+        Antall_Tall=antall_tall,
+        Antall_Gyldige=antall_tall - antall_utenfor,
+        Antall_Utenfor=antall_utenfor,
+        Flagg_Tomt_Svar=tekst.str.strip() == "",
+        Flagg_Mangler=antall_tall < forventet,
+        Flagg_Overskudd=antall_tall > forventet,
+        Flagg_Utenfor_Intervall=antall_utenfor > 0,
+    )
+
+    # Konfidens: andel av forventede plasser med gyldig score, straffet for ekstra
+    # tall (tvetydig hvilke som er scorene) og halvert ved tall utenfor -2..+2.
+    dekning = scorer.notna().sum(axis=1) / forventet
+    entydighet = forventet / antall_tall.clip(lower=forventet)
+    straff = antall_utenfor.gt(0).map({True: 0.5, False: 1.0})
+    resultat["Parse_Konfidens"] = (dekning * entydighet * straff).round(3)
+    return resultat
+
+def scorer_fra_tekst(tekst, forventet):
+    """
+    Scorene fra ett enkelt svar som liste, etter reglene i _tolk (samme som parse_svar).
+    Manglende og ugyldige plasser fylles ut med 0 (som i analyse_resultater.csv).
+    """
+    plasser, _, _ = _tolk(tekst or "", forventet)
+    return [0 if verdi is None else verdi for verdi in plasser]
+
+def parse_raa_svar(raa_df):
+    """
+    Parser alle rå svar for en kjøring (kolonnene Stabilitet_Svar og Driver_Svar)
+    og returnerer én rad per fil med scorer, flagg og konfidens per svar.
+    """
+    stabilitet = parse_svar(raa_df["Stabilitet_Svar"], 1)
+    drivere = parse_svar(raa_df["Driver_Svar"], len(DRIVERE))
+
+    resultat = raa_df.drop(columns=["Stabilitet_Svar", "Driver_Svar"])
+    for i, navn in enumerate(DRIVERE):
+        resultat[navn] = drivere[f"Score_{i}"]
+    resultat[STABILITET] = stabilitet["Score_0"]
+
+    for prefiks, parsed in (("Drivere", drivere), ("Stabilitet", stabilitet)):
+        for kolonne in parsed.columns:
+            if not kolonne.startswith("Score_"):
+                resultat[f"{prefiks}_{kolonne}"] = parsed[kolonne]
+
+    resultat["Parse_Konfidens"] = resultat[["Drivere_Parse_Konfidens", "Stabilitet_Parse_Konfidens"]].min(axis=1)
+    resultat["Antall_Utfylt"] = drivere[[f"Score_{i}" for i in range(len(DRIVERE))]].isna().sum(axis=1)
+    return resultat
+
+def til_resultater(parsed):
+    """Samme format som analyse_resultater.csv: manglende scorer fylles ut med 0."""
+    kolonner = ["Filnavn", "Periode"] + DRIVERE + [STABILITET, "Parse_Konfidens", "Antall_Utfylt"]
+    resultater = parsed[[k for k in kolonner if k in parsed.columns]].copy()
+    resultater[DRIVERE + [STABILITET]] = resultater[DRIVERE + [STABILITET]].fillna(0).astype(int)
+    return resultater
+
+def raa_svar_sti(run_id, directory=RAA_SVAR_DIR):
+    return os.path.join(directory, f"{run_id}.parquet")
+
+def raa_svar_logg_sti(run_id, directory=RAA_SVAR_DIR):
+    return os.path.join(directory, f"{run_id}.jsonl")
+
+def legg_til_raa_svar(rad, run_id, directory=RAA_SVAR_DIR):
+    """
+    Legger ett rått svar til kjøringens jsonl-logg med en gang det er hentet,
+    slik at betalte API-kall ikke går tapt hvis kjøringen krasjer underveis.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(raa_svar_logg_sti(run_id, directory), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(rad, ensure_ascii=False) + "\n")
+
+def lagre_raa_svar(raa_df, run_id, directory=RAA_SVAR_DIR):
+    """Lagrer modellens rå svar for en kjøring som parquet og fjerner jsonl-loggen."""
+    os.makedirs(directory, exist_ok=True)
+    sti = raa_svar_sti(run_id, directory)
+    raa_df.to_parquet(sti, index=False)
+    logg = raa_svar_logg_sti(run_id, directory)
+    if os.path.exists(logg): os.remove(logg)
+    return sti
+
+def last_raa_svar(run_id, directory=RAA_SVAR_DIR):
+    """Leser rå svar fra parquet, eller fra jsonl-loggen hvis kjøringen ikke ble fullført."""
+    sti = raa_svar_sti(run_id, directory)
+    if os.path.exists(sti):
+        return pd.read_parquet(sti)
+    return pd.read_json(raa_svar_logg_sti(run_id, directory), lines=True, dtype=False, convert_dates=False)
+
+def rescore_run(run_id, output_filename=RESULTAT_FIL, directory=RAA_SVAR_DIR):
+    """
+    Re-scorer en hel kjøring fra de lagrede rå svarene: skriver resultatfilen på
+    nytt, lagrer detaljert parse-resultat ved siden av de rå svarene og bytter ut
+    kjøringens celler i aggregatkuben.
+    """
+    parsed = parse_raa_svar(last_raa_svar(run_id, directory))
+    parsed.to_parquet(os.path.join(directory, f"{run_id}_parsed.parquet"), index=False)
+
+    resultater = til_resultater(parsed)
+    resultater.to_csv(output_filename, index=False, sep=';')
+    lagre_kube(erstatt_run(last_kube(), resultater, run_id))
+    registrer_resultatfil(run_id, output_filename)
+
+    lav = (parsed["Parse_Konfidens"] < 1).sum()
+    print(f"Re-scoret {len(parsed)} filer fra run {run_id}. {lav} med redusert parse-konfidens.")
+    return parsed